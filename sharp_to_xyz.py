@@ -12,24 +12,83 @@ Author: DanciShen
 License: MIT
 """
 
-import struct
+import mmap
 import sys
 import os
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Tuple, List, Optional
+from typing import BinaryIO, List, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
 
 # Spherical harmonics constant for DC component (degree 0)
 SH_C0 = 0.28209479177387814
 
+# Vertex properties read from the PLY file; everything else is skipped
+POSITION_FIELDS = ('x', 'y', 'z')
+COLOR_FIELDS = ('f_dc_0', 'f_dc_1', 'f_dc_2')
 
-def sh_to_rgb(f_dc_0: float, f_dc_1: float, f_dc_2: float) -> Tuple[int, int, int]:
+# Neutral gray used for points without color data
+DEFAULT_GRAY = 128
+
+# Block size used when reading the PLY header
+HEADER_READ_SIZE = 65536
+
+# Devices the SH color conversion can run on
+DEVICES = ('cpu', 'cuda')
+
+# Number of vertices per pipeline stage; the next chunk is decoded while
+# the current one is written in the background
+STREAM_CHUNK = 1 << 20
+
+# Number of output lines formatted and written per write() call
+WRITE_CHUNK = 65536
+
+# Output formats and their default file extensions
+OUTPUT_EXTENSIONS = {
+    'xyz': '.xyz',
+    'bin': '.bin',
+}
+
+# Record layout of the binary output format: packed little-endian
+# float32 x, y, z followed by uint8 r, g, b (15 bytes per point)
+BINARY_POINT_DTYPE = np.dtype([
+    ('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+    ('r', 'u1'), ('g', 'u1'), ('b', 'u1'),
+])
+
+
+def sh_to_rgb_array(f_dc: np.ndarray) -> np.ndarray:
     """
-    Convert spherical harmonics DC component to RGB (0-255).
+    Convert spherical harmonics DC components to RGB (0-255) for many points.
 
     The DC component of spherical harmonics represents the base color.
     Formula: color = 0.5 + SH_C0 * f_dc
 
+    Args:
+        f_dc: Array of shape (N, 3) holding the R, G, B SH coefficients
+
+    Returns:
+        uint8 array of shape (N, 3) with values in range 0-255
+    """
+    # Do every step in place on one scratch buffer instead of allocating a
+    # temporary per operation. The math is done in double precision, like
+    # the scalar formula, so float32 input rounds to the same colors
+    tmp = np.array(f_dc, dtype=np.float64)
+    tmp *= SH_C0
+    tmp += 0.5
+    # The scalar max(0.0, min(1.0, c)) maps NaN to 1.0; np.clip would not
+    np.nan_to_num(tmp, copy=False, nan=1.0)
+    np.clip(tmp, 0.0, 1.0, out=tmp)
+    tmp *= 255.0
+    return tmp.astype(np.uint8)
+
+
+def sh_to_rgb(f_dc_0: float, f_dc_1: float, f_dc_2: float) -> Tuple[int, int, int]:
+    """
+    Convert a single spherical harmonics DC component to RGB (0-255).
+
     Args:
         f_dc_0: Red channel SH coefficient
         f_dc_1: Green channel SH coefficient
@@ -38,10 +97,168 @@ def sh_to_rgb(f_dc_0: float, f_dc_1: float, f_dc_2: float) -> Tuple[int, int, in
     Returns:
         Tuple of (R, G, B) values in range 0-255
     """
-    r = max(0.0, min(1.0, 0.5 + SH_C0 * f_dc_0))
-    g = max(0.0, min(1.0, 0.5 + SH_C0 * f_dc_1))
-    b = max(0.0, min(1.0, 0.5 + SH_C0 * f_dc_2))
-    return int(r * 255), int(g * 255), int(b * 255)
+    r, g, b = sh_to_rgb_array(np.array([[f_dc_0, f_dc_1, f_dc_2]]))[0].tolist()
+    return r, g, b
+
+
+# CuPy is optional and only imported when device='cuda' is requested, so
+# CPU runs never pay for it. False until the import has been tried, then
+# the module, or None when CuPy is not installed
+_cupy = False
+
+
+def _load_cupy():
+    """Return the CuPy module, or None if CuPy is not installed."""
+    global _cupy
+    if _cupy is False:
+        try:
+            import cupy
+        except ImportError:
+            _cupy = None
+        else:
+            _cupy = cupy
+    return _cupy
+
+
+def _sh_to_rgb_cuda(f_dc: np.ndarray) -> np.ndarray:
+    """
+    GPU version of sh_to_rgb_array using CuPy.
+
+    Copies the coefficients to the device, converts them there and copies
+    the uint8 result back, so only 3 bytes per point return over PCIe.
+
+    Args:
+        f_dc: Array of shape (N, 3) holding the R, G, B SH coefficients
+
+    Returns:
+        uint8 array of shape (N, 3) with values in range 0-255
+    """
+    cupy = _load_cupy()
+
+    # Copy to the device as float64 to match sh_to_rgb_array's rounding
+    d_tmp = cupy.asarray(f_dc, dtype=cupy.float64)
+    d_tmp *= SH_C0
+    d_tmp += 0.5
+    # NaN maps to full intensity, as in sh_to_rgb_array
+    cupy.nan_to_num(d_tmp, copy=False, nan=1.0)
+    cupy.clip(d_tmp, 0.0, 1.0, out=d_tmp)
+    d_tmp *= 255.0
+    return cupy.asnumpy(d_tmp.astype(cupy.uint8))
+
+
+# Numba is optional and only imported when the kernel is first needed, so
+# startup stays fast. False until the import has been tried, then the
+# compiled kernel, or None when Numba is not installed
+_numba_kernel = False
+
+
+def _load_numba_kernel():
+    """Return the Numba decode kernel, or None if Numba is not installed."""
+    global _numba_kernel
+    if _numba_kernel is False:
+        try:
+            import numba
+        except ImportError:
+            _numba_kernel = None
+        else:
+            _numba_kernel = _build_numba_kernel(numba)
+    return _numba_kernel
+
+
+def _build_numba_kernel(numba):
+    """Compile the parallel vertex decode kernel with the given Numba module."""
+    @numba.njit(parallel=True, nogil=True, cache=True)
+    def decode_vertices(words, stride, offsets, xyz, rgb):
+        """
+        Gather x, y, z (and f_dc_0..2 when present) straight from the raw
+        vertex records and convert the colors, in parallel.
+
+        `words` is the vertex block viewed as float32; `stride` and
+        `offsets` are measured in float32 words. `offsets` has three
+        entries for position only, six when the record carries color.
+        """
+        # Colors are computed in double precision to match sh_to_rgb_array
+        sh_c0 = np.float64(SH_C0)
+        half = np.float64(0.5)
+        one = np.float64(1.0)
+        zero = np.float64(0.0)
+        scale = np.float64(255.0)
+        has_color = offsets.shape[0] == 6
+
+        for i in numba.prange(xyz.shape[0]):
+            base = i * stride
+            for j in range(3):
+                xyz[i, j] = words[base + offsets[j]]
+            if has_color:
+                for j in range(3):
+                    c = half + sh_c0 * np.float64(words[base + offsets[3 + j]])
+                    # NaN maps to full intensity, as in sh_to_rgb_array
+                    if c != c:
+                        c = one
+                    c = min(max(c, zero), one)
+                    rgb[i, j] = np.uint8(c * scale)
+
+    return decode_vertices
+
+
+def _extract_points(
+    vertices: np.ndarray,
+    has_color: bool,
+    device: str = 'cpu'
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pull positions and RGB colors out of the structured vertex records.
+
+    Records without color data get a uniform neutral gray, so callers always
+    receive the same (N, 3) + (N, 3) layout.
+
+    On the CPU, uses the Numba kernel when Numba is installed and the
+    records are made of native float32 words; otherwise falls back to NumPy
+    column operations. With device='cuda' the colors are converted on the
+    GPU with CuPy.
+
+    Args:
+        vertices: Structured vertex array (may be backed by a memory map)
+        has_color: Whether the records carry f_dc_0..2 color coefficients
+        device: 'cpu' or 'cuda'
+
+    Returns:
+        Tuple of (xyz, rgb): contiguous (N, 3) float array and (N, 3) uint8
+        array. Neither array references the source records.
+    """
+    fields = POSITION_FIELDS + COLOR_FIELDS if has_color else POSITION_FIELDS
+    if has_color:
+        rgb = np.empty((len(vertices), 3), dtype=np.uint8)
+    else:
+        rgb = np.full((len(vertices), 3), DEFAULT_GRAY, dtype=np.uint8)
+
+    dtype_fields = vertices.dtype.fields
+    itemsize = vertices.dtype.itemsize
+    use_numba = (
+        device == 'cpu'
+        and itemsize % 4 == 0
+        and all(dtype_fields[n][0] == np.float32 for n in fields)
+        and all(dtype_fields[n][1] % 4 == 0 for n in fields)
+    )
+    decode_vertices = _load_numba_kernel() if use_numba else None
+
+    if decode_vertices is not None:
+        offsets = np.array([dtype_fields[n][1] // 4 for n in fields], dtype=np.int64)
+        xyz = np.empty((len(vertices), 3), dtype=np.float32)
+        words = vertices.view(np.uint8).view(np.float32)
+        decode_vertices(words, itemsize // 4, offsets, xyz, rgb)
+        return xyz, rgb
+
+    xyz = np.stack([vertices[name] for name in POSITION_FIELDS], axis=1)
+
+    if has_color:
+        f_dc = np.stack([vertices[name] for name in COLOR_FIELDS], axis=1)
+        if device == 'cuda':
+            rgb = _sh_to_rgb_cuda(f_dc)
+        else:
+            rgb = sh_to_rgb_array(f_dc)
+
+    return xyz, rgb
 
 
 def parse_ply_header(file_path: str) -> dict:
@@ -57,39 +274,62 @@ def parse_ply_header(file_path: str) -> dict:
         - header_size: Size of header in bytes
         - format: 'binary_little_endian' or 'ascii'
     """
+    # Read the header in bulk rather than line by line
     with open(file_path, 'rb') as f:
-        elements = []
-        current_element = None
-        format_type = None
-
+        buf = b''
+        marker = -1
         while True:
-            line = f.readline()
-            decoded = line.decode('utf-8').strip()
-
-            if decoded.startswith('format'):
-                format_type = decoded.split()[1]
-            elif decoded.startswith('element'):
-                parts = decoded.split()
-                current_element = {
-                    'name': parts[1],
-                    'count': int(parts[2]),
-                    'properties': []
-                }
-                elements.append(current_element)
-            elif decoded.startswith('property'):
-                parts = decoded.split()
-                prop_type = parts[1]
-                prop_name = parts[2]
-                current_element['properties'].append((prop_name, prop_type))
-            elif decoded == 'end_header':
-                header_size = f.tell()
+            block = f.read(HEADER_READ_SIZE)
+            if marker < 0:
+                # Search from slightly before the new block in case the
+                # marker straddles two reads
+                search_from = max(0, len(buf) - len(b'\nend_header'))
+                buf += block
+                marker = buf.find(b'\nend_header', search_from)
+            else:
+                buf += block
+
+            if marker >= 0:
+                line_end = buf.find(b'\n', marker + 1)
+                if line_end >= 0:
+                    header_size = line_end + 1
+                    break
+
+            if not block:
+                if marker < 0:
+                    raise ValueError("No end_header found in PLY file")
+                # end_header is the last line and has no trailing newline
+                header_size = len(buf)
                 break
 
-        return {
-            'elements': elements,
-            'header_size': header_size,
-            'format': format_type
-        }
+    elements = []
+    current_element = None
+    format_type = None
+
+    for line in buf[:header_size].decode('utf-8').splitlines():
+        decoded = line.strip()
+
+        if decoded.startswith('format'):
+            format_type = decoded.split()[1]
+        elif decoded.startswith('element'):
+            parts = decoded.split()
+            current_element = {
+                'name': parts[1],
+                'count': int(parts[2]),
+                'properties': []
+            }
+            elements.append(current_element)
+        elif decoded.startswith('property'):
+            parts = decoded.split()
+            prop_type = parts[1]
+            prop_name = parts[2]
+            current_element['properties'].append((prop_name, prop_type))
+
+    return {
+        'elements': elements,
+        'header_size': header_size,
+        'format': format_type
+    }
 
 
 def get_type_format(prop_type: str) -> Tuple[str, int]:
@@ -123,24 +363,127 @@ def get_type_format(prop_type: str) -> Tuple[str, int]:
     return type_map.get(prop_type, ('f', 4))
 
 
+def build_vertex_dtype(
+    properties: List[Tuple[str, str]],
+    fields: Optional[Sequence[str]] = None
+) -> np.dtype:
+    """
+    Build a NumPy structured dtype matching the binary vertex layout.
+
+    Properties not listed in `fields` are left as unnamed padding, so the
+    record size and field offsets still match the file but no column is
+    created for them.
+
+    Args:
+        properties: List of (name, type) tuples from the PLY header
+        fields: Property names to expose (default: all properties)
+
+    Returns:
+        Little-endian structured dtype spanning one full vertex record
+    """
+    names = []
+    formats = []
+    offsets = []
+    offset = 0
+
+    for prop_name, prop_type in properties:
+        fmt_char, size = get_type_format(prop_type)
+        if fields is None or prop_name in fields:
+            names.append(prop_name)
+            formats.append('<' + fmt_char)
+            offsets.append(offset)
+        offset += size
+
+    return np.dtype({
+        'names': names,
+        'formats': formats,
+        'offsets': offsets,
+        'itemsize': offset
+    })
+
+
+def _write_xyz_ascii(f_out: TextIO, xyz: np.ndarray, rgb: np.ndarray) -> None:
+    """
+    Append points to an open text file as ASCII "X Y Z R G B" lines.
+
+    Args:
+        f_out: Output file opened in text mode
+        xyz: (N, 3) positions
+        rgb: (N, 3) uint8 colors
+    """
+    vertex_count = len(xyz)
+    points = np.column_stack([xyz, rgb])
+
+    # 9 significant digits is the shortest fixed precision that round-trips
+    # every float32. Other position types (double, integers) use repr,
+    # which round-trips exactly like the original per-vertex f-string
+    coord_fmt = '%.9g' if xyz.dtype == np.float32 else '%r'
+    line_fmt = ' '.join([coord_fmt] * 3) + ' %d %d %d\n'
+
+    # Format each chunk with a single %-operation over the flattened
+    # values, so the C formatter runs without per-row Python work
+    for start in range(0, vertex_count, WRITE_CHUNK):
+        end = min(start + WRITE_CHUNK, vertex_count)
+        values = tuple(points[start:end].ravel().tolist())
+        f_out.write(line_fmt * (end - start) % values)
+
+
+def _write_xyz_binary(f_out: BinaryIO, xyz: np.ndarray, rgb: np.ndarray) -> None:
+    """
+    Append points to an open binary file as packed BINARY_POINT_DTYPE records.
+
+    Args:
+        f_out: Output file opened in binary mode
+        xyz: (N, 3) positions
+        rgb: (N, 3) uint8 colors
+    """
+    out = np.empty(len(xyz), dtype=BINARY_POINT_DTYPE)
+    out['x'] = xyz[:, 0]
+    out['y'] = xyz[:, 1]
+    out['z'] = xyz[:, 2]
+    out['r'] = rgb[:, 0]
+    out['g'] = rgb[:, 1]
+    out['b'] = rgb[:, 2]
+    out.tofile(f_out)
+
+
+def _check_device(device: str) -> None:
+    """Raise if `device` is unknown or its backend is not installed."""
+    if device not in DEVICES:
+        raise ValueError(f"Unknown device: {device}")
+    if device == 'cuda' and _load_cupy() is None:
+        raise RuntimeError("CuPy is required for device='cuda'")
+
+
 def convert_ply_to_xyz(
     input_path: str,
     output_path: Optional[str] = None,
-    verbose: bool = True
+    verbose: bool = True,
+    output_format: str = 'xyz',
+    device: str = 'cpu'
 ) -> str:
     """
     Convert SHARP 3DGS PLY file to XYZ point cloud format.
 
     Args:
         input_path: Path to input PLY file
-        output_path: Path to output XYZ file (default: same name with .xyz extension)
+        output_path: Path to output file (default: same name with the
+            extension for `output_format`)
         verbose: Print progress information
+        output_format: 'xyz' for ASCII "X Y Z R G B" lines, or 'bin' for
+            packed BINARY_POINT_DTYPE records
+        device: 'cpu', or 'cuda' to convert colors on the GPU (requires CuPy)
 
     Returns:
         Path to output file
     """
+    if output_format not in OUTPUT_EXTENSIONS:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    _check_device(device)
+
     if output_path is None:
-        output_path = os.path.splitext(input_path)[0] + '.xyz'
+        output_path = os.path.splitext(input_path)[0] + OUTPUT_EXTENSIONS[output_format]
 
     if verbose:
         print(f"Reading: {input_path}")
@@ -166,86 +509,143 @@ def convert_ply_to_xyz(
         print(f"Vertex count: {vertex_count:,}")
         print(f"Properties: {len(properties)}")
 
-    # Build format string and calculate sizes
-    format_string = '<'
-    bytes_per_vertex = 0
+    property_names = {prop_name for prop_name, _ in properties}
 
-    for prop_name, prop_type in properties:
-        fmt_char, size = get_type_format(prop_type)
-        format_string += fmt_char
-        bytes_per_vertex += size
+    for axis in POSITION_FIELDS:
+        if axis not in property_names:
+            raise ValueError(f"Vertex element has no '{axis}' property")
 
-    # Read binary data
-    with open(input_path, 'rb') as f:
-        f.seek(metadata['header_size'])
-        vertex_data_size = vertex_count * bytes_per_vertex
-        binary_data = f.read(vertex_data_size)
+    has_color = all(name in property_names for name in COLOR_FIELDS)
 
-    if len(binary_data) != vertex_data_size:
-        raise ValueError(f"Expected {vertex_data_size} bytes, got {len(binary_data)}")
+    # Only expose the columns we use; the rest of each record is padding
+    fields = POSITION_FIELDS + COLOR_FIELDS if has_color else POSITION_FIELDS
+    vertex_dtype = build_vertex_dtype(properties, fields)
 
-    # Get property indices
-    prop_indices = {name: i for i, (name, _) in enumerate(properties)}
+    # Map the file and view the vertex data in place
+    header_size = metadata['header_size']
+    vertex_data_size = vertex_count * vertex_dtype.itemsize
 
-    x_idx = prop_indices.get('x', 0)
-    y_idx = prop_indices.get('y', 1)
-    z_idx = prop_indices.get('z', 2)
-    f_dc_0_idx = prop_indices.get('f_dc_0')
-    f_dc_1_idx = prop_indices.get('f_dc_1')
-    f_dc_2_idx = prop_indices.get('f_dc_2')
+    with open(input_path, 'rb') as f:
+        body_size = os.fstat(f.fileno()).st_size - header_size
+        if body_size < vertex_data_size:
+            raise ValueError(f"Expected {vertex_data_size} bytes, got {body_size}")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
-    has_color = f_dc_0_idx is not None
+    # The mapping is closed even if decoding or writing fails
+    try:
+        vertices = np.frombuffer(
+            mm, dtype=vertex_dtype, count=vertex_count, offset=header_size
+        )
 
-    if verbose:
-        print(f"Has color data: {has_color}")
-        print(f"Writing: {output_path}")
+        if verbose:
+            print(f"Has color data: {has_color}")
+            print(f"Writing: {output_path}")
+
+        if output_format == 'bin':
+            f_out = open(output_path, 'wb')
+            write_points = _write_xyz_binary
+        else:
+            f_out = open(output_path, 'w', buffering=1 << 20)
+            write_points = _write_xyz_ascii
+
+        # Pipeline the conversion in chunks: while one chunk is formatted
+        # and written in a background thread, the next is decoded from the
+        # mapping. Each chunk's used columns are copied into dense arrays,
+        # so only those small arrays are live while writing. Decoding stays
+        # on the calling thread so the Numba and CuPy backends are never
+        # driven from a worker
+        with f_out, ThreadPoolExecutor(max_workers=1) as writer:
+            pending = None
+            for start in range(0, vertex_count, STREAM_CHUNK):
+                end = min(start + STREAM_CHUNK, vertex_count)
+                xyz, rgb = _extract_points(
+                    vertices[start:end], has_color, device=device
+                )
+
+                # Wait for the previous chunk so at most one is queued
+                if pending is not None:
+                    pending.result()
+                pending = writer.submit(write_points, f_out, xyz, rgb)
+
+                if verbose and end // 200000 > start // 200000:
+                    print(f"  Processed {end:,}/{vertex_count:,} vertices...")
+
+            if pending is not None:
+                pending.result()
+    finally:
+        # Drop the record view before unmapping the file
+        vertices = None
+        try:
+            mm.close()
+        except BufferError:
+            # A chunk view is still held by the traceback of an error in
+            # flight; the mapping is released together with it
+            pass
 
-    # Write XYZ file
-    with open(output_path, 'w') as f_out:
-        for i in range(vertex_count):
-            offset = i * bytes_per_vertex
-            vertex_bytes = binary_data[offset:offset + bytes_per_vertex]
-            vertex_data = struct.unpack(format_string, vertex_bytes)
+    if verbose:
+        print(f"Done! Output: {output_path}")
 
-            x = vertex_data[x_idx]
-            y = vertex_data[y_idx]
-            z = vertex_data[z_idx]
+    return output_path
 
-            if has_color:
-                f_dc_0 = vertex_data[f_dc_0_idx]
-                f_dc_1 = vertex_data[f_dc_1_idx]
-                f_dc_2 = vertex_data[f_dc_2_idx]
-                r, g, b = sh_to_rgb(f_dc_0, f_dc_1, f_dc_2)
-            else:
-                r, g, b = 128, 128, 128
 
-            f_out.write(f"{x} {y} {z} {r} {g} {b}\n")
+def _init_batch_worker(kernel_threads: int) -> None:
+    """
+    Limit the Numba kernel threads in a batch worker process.
 
-            if verbose and (i + 1) % 200000 == 0:
-                print(f"  Processed {i + 1:,}/{vertex_count:,} vertices...")
+    The process pool already runs one file per core, so each worker's
+    kernel gets its share of the cores instead of all of them.
+    """
+    numba = sys.modules.get('numba')
+    if numba is not None:
+        numba.set_num_threads(min(kernel_threads, numba.config.NUMBA_NUM_THREADS))
+    else:
+        # Read by Numba when it is imported on first use
+        os.environ['NUMBA_NUM_THREADS'] = str(kernel_threads)
 
-    if verbose:
-        print(f"Done! Output: {output_path}")
 
-    return output_path
+def _convert_one(job: Tuple[str, str, str, str]) -> str:
+    """Convert a single (input, output, format, device) job quietly; used by worker processes."""
+    input_file, output_file, output_format, device = job
+    return convert_ply_to_xyz(
+        input_file, output_file, verbose=False,
+        output_format=output_format, device=device
+    )
 
 
 def batch_convert(
     input_dir: str,
     output_dir: Optional[str] = None,
-    verbose: bool = True
+    verbose: bool = True,
+    workers: Optional[int] = None,
+    output_format: str = 'xyz',
+    device: str = 'cpu'
 ) -> List[str]:
     """
     Convert all PLY files in a directory.
 
+    Files are converted in parallel, one per worker process.
+
     Args:
         input_dir: Directory containing PLY files
         output_dir: Output directory (default: same as input)
         verbose: Print progress information
+        workers: Number of worker processes (default: CPU count, or 1 with
+            device='cuda' since every worker would create its own CUDA
+            context and buffers on the same GPU)
+        output_format: Output format, see convert_ply_to_xyz
+        device: Device for color conversion, see convert_ply_to_xyz
 
     Returns:
         List of output file paths
     """
+    if output_format not in OUTPUT_EXTENSIONS:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    _check_device(device)
+
     input_path = Path(input_dir)
     output_path = Path(output_dir) if output_dir else input_path
 
@@ -256,16 +656,50 @@ def batch_convert(
     if verbose:
         print(f"Found {len(ply_files)} PLY files")
 
-    outputs = []
-    for i, ply_file in enumerate(ply_files, 1):
-        if verbose:
-            print(f"\n[{i}/{len(ply_files)}] Processing {ply_file.name}")
-
-        output_file = output_path / (ply_file.stem + '.xyz')
-        convert_ply_to_xyz(str(ply_file), str(output_file), verbose=verbose)
-        outputs.append(str(output_file))
-
-    return outputs
+    jobs = [
+        (
+            str(ply_file),
+            str(output_path / (ply_file.stem + OUTPUT_EXTENSIONS[output_format])),
+            output_format,
+            device
+        )
+        for ply_file in ply_files
+    ]
+
+    if not jobs:
+        return []
+
+    # Split the cores between worker processes and their kernel threads
+    cpu_count = os.cpu_count() or 1
+    if workers is None:
+        workers = 1 if device == 'cuda' else cpu_count
+    pool_size = min(workers, len(jobs))
+    kernel_threads = max(1, cpu_count // pool_size)
+
+    with ProcessPoolExecutor(
+        max_workers=pool_size,
+        initializer=_init_batch_worker,
+        initargs=(kernel_threads,)
+    ) as executor:
+        futures = {executor.submit(_convert_one, job): job for job in jobs}
+        for i, future in enumerate(as_completed(futures), 1):
+            output_file = future.result()
+            if verbose:
+                print(f"[{i}/{len(jobs)}] Converted {Path(futures[future][0]).name}"
+                      f" -> {output_file}")
+
+    return [job[1] for job in jobs]
+
+
+def _positive_int(value: str) -> int:
+    """argparse type for integers >= 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"must be an integer, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 
 def main():
@@ -277,6 +711,8 @@ Examples:
   %(prog)s input.ply                    # Convert single file
   %(prog)s input.ply output.xyz         # Convert with custom output name
   %(prog)s ./ply_folder/ ./xyz_output/  # Batch convert directory
+  %(prog)s ./ply_folder/ -j 4           # Batch convert with 4 workers
+  %(prog)s input.ply -f bin             # Write packed binary output
   %(prog)s input.ply -q                 # Quiet mode
         """
     )
@@ -288,13 +724,35 @@ Examples:
     parser.add_argument(
         'output',
         nargs='?',
-        help='Output XYZ file or directory (default: same location with .xyz extension)'
+        help='Output file or directory (default: same location with the extension '
+             'for --format: '
+             + ', '.join(f'{ext} for {fmt}' for fmt, ext in OUTPUT_EXTENSIONS.items())
+             + ')'
     )
     parser.add_argument(
         '-q', '--quiet',
         action='store_true',
         help='Suppress progress output'
     )
+    parser.add_argument(
+        '-f', '--format',
+        choices=sorted(OUTPUT_EXTENSIONS),
+        default='xyz',
+        help='Output format: ASCII xyz, or packed binary float32 xyz + uint8 rgb (default: xyz)'
+    )
+    parser.add_argument(
+        '--device',
+        choices=DEVICES,
+        default='cpu',
+        help='Device for SH color conversion; cuda requires CuPy (default: cpu)'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=_positive_int,
+        default=None,
+        help='Number of parallel worker processes for batch conversion '
+             '(default: CPU count, or 1 with --device cuda)'
+    )
     parser.add_argument(
         '-v', '--version',
         action='version',
@@ -307,9 +765,16 @@ Examples:
     verbose = not args.quiet
 
     if input_path.is_dir():
-        batch_convert(str(input_path), args.output, verbose=verbose)
+        batch_convert(
+            str(input_path), args.output, verbose=verbose,
+            workers=args.jobs, output_format=args.format,
+            device=args.device
+        )
     elif input_path.is_file():
-        convert_ply_to_xyz(str(input_path), args.output, verbose=verbose)
+        convert_ply_to_xyz(
+            str(input_path), args.output, verbose=verbose,
+            output_format=args.format, device=args.device
+        )
     else:
         print(f"Error: {args.input} does not exist", file=sys.stderr)
         sys.exit(1)